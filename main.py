@@ -1,23 +1,72 @@
+"""Command line entry point: python main.py [--backend numpy] [--coordinates cities.csv] ..."""
+import argparse
 import time
 
-solution_type = 'NP'
-
-if solution_type == 'OOP':
-    from oop.services import TravelerServices
-
-elif solution_type == 'NP':
-    from np.services import TravelerServices
-
 
 POPULATION_SIZE = 200
 GENERATIONS = 80
+HEURISTIC_RATIO = 0.5
 COORDINATES = [(1, 7), (2, 5), (4, 4), (2, 3), (3, 2),
                 (1, 1), (5, 1), (7, 3), (6, 6), (10, 5),
                 (9, 8), (13, 6), (12, 3), (13, 1)]
 
-if __name__ == '__main__':
+
+def read_coordinates(path: str) -> list:
+    """
+    Read the coordinates of the cities from a file with one 'x,y' pair per line.
+
+    param path: String with the path of the file
+    return: List of tuples with the coordinates for each city -> [(p1,p2), ...]
+    """
+    with open(path) as file:
+        return [tuple(float(value) for value in line.split(",")[:2])
+                for line in file if line.strip() and not line.startswith("#")]
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """Build the parser of the command line arguments."""
+    parser = argparse.ArgumentParser(description="Solve the traveler problem with a genetic "
+                                                 "algorithm.")
+    parser.add_argument("--backend", default="auto",
+                        choices=("auto", "python", "numpy", "compiled", "multiprocess"),
+                        help="engine to use (default: %(default)s)")
+    parser.add_argument("--population-size", type=int, default=POPULATION_SIZE,
+                        help="size of the population (default: %(default)s)")
+    parser.add_argument("--generations", type=int, default=GENERATIONS,
+                        help="number of generations (default: %(default)s)")
+    parser.add_argument("--heuristic-ratio", type=float, default=HEURISTIC_RATIO,
+                        help="portion of the initial population built with heuristics "
+                             "(default: %(default)s)")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="workers for the multiprocess engine (default: number of CPUs)")
+    parser.add_argument("--coordinates", metavar="FILE",
+                        help="file with one 'x,y' pair per city (default: built-in example)")
+    parser.add_argument("--history", action="store_true",
+                        help="print the best distance of every generation")
+    return parser
+
+
+def main(argv: list = None):
+    """
+    Parse the arguments and run the solver. The solver and its engines are imported only here,
+    so '--help' and argument errors do not pay for NumPy.
+
+    param argv: List with the command line arguments, by default the ones from 'sys.argv'
+    """
+    args = get_parser().parse_args(argv)
+    coordinates = read_coordinates(args.coordinates) if args.coordinates else COORDINATES
+
+    from solver import Solver, SolverConfig
+
     t1 = time.time()
-    traveler = TravelerServices(POPULATION_SIZE, COORDINATES)
-    traveler.run(GENERATIONS)
+    config = SolverConfig(args.population_size, args.generations, args.heuristic_ratio,
+                          backend=args.backend, processes=args.processes)
+    result = Solver(config).solve(coordinates)
     print(time.time() - t1)
-    # print(traveler.aptitude_function_history)
+    print(result)
+    if args.history:
+        print(result.history)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""Contains a version of the traveler services whose generation loop is compiled with numba."""
+import time
+import numpy as np
+from numba import njit
+from .operators import OPERATORS
+from .services import TravelerServices
+
+
+@njit(cache=True)
+def reversal(parent, child):
+    """Compiled version of 'operators.reversal', writing into 'child'."""
+    size = len(parent)
+    child[:] = parent
+    if size < 2:
+        return
+    start_index = np.random.randint(0, size - 1)
+    end_index = np.random.randint(start_index, size)
+    child[start_index:end_index + 1] = parent[start_index:end_index + 1][::-1]
+
+
+@njit(cache=True)
+def segment_swap(parent, child):
+    """Compiled version of 'operators.segment_swap', writing into 'child'."""
+    size = len(parent)
+    if size < 5:
+        reversal(parent, child)
+        return
+
+    while True:
+        start_index_a = np.random.randint(0, size - 4)
+        end_index_a = np.random.randint(start_index_a + 1, size - 3)
+        chunk_size = end_index_a - start_index_a
+        if end_index_a + 1 >= size - chunk_size:
+            continue
+        start_index_b = np.random.randint(end_index_a + 1, size - chunk_size)
+        if start_index_b + chunk_size < size:
+            break
+
+    child[:] = parent
+    child[start_index_a:end_index_a + 1] = parent[start_index_b:start_index_b + chunk_size + 1]
+    child[start_index_b:start_index_b + chunk_size + 1] = parent[start_index_a:end_index_a + 1]
+
+
+@njit(cache=True)
+def move_chunk(parent, child, start_index, chunk_size, target_index, reverse):
+    """Writing into 'child' the parent with a chunk moved to 'target_index' of the rest."""
+    position, rest_index = 0, 0
+    for index in range(len(parent)):
+        if start_index <= index < start_index + chunk_size:
+            continue
+        if rest_index == target_index:
+            for offset in range(chunk_size):
+                child[position] = parent[start_index + (chunk_size - 1 - offset if reverse
+                                                        else offset)]
+                position += 1
+        child[position] = parent[index]
+        position += 1
+        rest_index += 1
+    if rest_index == target_index:  # The chunk goes at the end
+        for offset in range(chunk_size):
+            child[position] = parent[start_index + (chunk_size - 1 - offset if reverse
+                                                    else offset)]
+            position += 1
+
+
+@njit(cache=True)
+def insertion(parent, child):
+    """Compiled version of 'operators.insertion', writing into 'child'."""
+    size = len(parent)
+    if size < 2:
+        child[:] = parent
+        return
+    source_index = np.random.randint(0, size)
+    target_index = np.random.randint(0, size - 1)
+    if target_index >= source_index:
+        target_index += 1
+    # The target is a position of the final chromosome, that is of the rest plus the gene
+    move_chunk(parent, child, source_index, 1, target_index, False)
+
+
+@njit(cache=True)
+def or_opt(parent, child):
+    """Compiled version of 'operators.or_opt', writing into 'child'."""
+    size = len(parent)
+    if size < 3:
+        reversal(parent, child)
+        return
+    chunk_size = np.random.randint(1, min(3, size - 2) + 1)
+    start_index = np.random.randint(0, size - chunk_size + 1)
+    reverse = np.random.randint(0, 2) == 1
+    target_index = np.random.randint(0, size - chunk_size)
+    if target_index >= start_index:
+        target_index += 1
+    move_chunk(parent, child, start_index, chunk_size, target_index, reverse)
+
+
+@njit(cache=True)
+def double_bridge(parent, child):
+    """Compiled version of 'operators.double_bridge', writing into 'child'."""
+    size = len(parent)
+    if size < 4:
+        reversal(parent, child)
+        return
+    cuts = np.sort(np.random.permutation(size - 1)[:3] + 1)
+    first, second, third = cuts[0], cuts[1], cuts[2]
+    child[:first] = parent[:first]
+    child[first:first + third - second] = parent[second:third]
+    child[first + third - second:third] = parent[first:second]
+    child[third:] = parent[third:]
+
+
+# Codes of the compiled operators, by their name in 'operators.OPERATORS'
+COMPILED_OPERATORS = {"reversal": 0, "segment_swap": 1, "insertion": 2, "or_opt": 3,
+                      "double_bridge": 4}
+
+
+@njit(cache=True)
+def get_child_population(population, aptitude_function, n_contenders, n_children, operator):
+    """
+    Compiled version of the tournament plus reproduction loop of 'TravelerServices', every
+    child is reproduced with the same operator.
+
+    :param population: Numpy Array with all the population [[1 ... n], ... ,[1 ... n]]
+    :param aptitude_function: Numpy Array with all the aptitude functions for each chromosome
+    :param n_contenders: Integer with the number of chromosomes on each tournament
+    :param n_children: Integer with the number of children to reproduce
+    :param operator: Integer with the code of the operator in 'COMPILED_OPERATORS'
+    :return: Tuple with the Numpy Arrays of children and of the index of their parents
+    """
+    population_size, chromosome_size = population.shape
+    child_population = np.empty((n_children, chromosome_size), dtype=population.dtype)
+    winners = np.empty(n_children, dtype=np.int64)
+
+    for i in range(n_children):
+        # Tournament
+        winner_index = np.random.randint(0, population_size)
+        for _ in range(n_contenders - 1):
+            index = np.random.randint(0, population_size)
+            if aptitude_function[winner_index] > aptitude_function[index]:
+                winner_index = index
+        winners[i] = winner_index
+
+        if operator == 0:
+            reversal(population[winner_index], child_population[i])
+        elif operator == 1:
+            segment_swap(population[winner_index], child_population[i])
+        elif operator == 2:
+            insertion(population[winner_index], child_population[i])
+        elif operator == 3:
+            or_opt(population[winner_index], child_population[i])
+        else:
+            double_bridge(population[winner_index], child_population[i])
+
+    return child_population, winners
+
+
+class CompiledTravelerServices(TravelerServices):
+    """Traveler services running the tournament and reproduction loop as compiled code."""
+
+    def get_child_population(self, population: np.array, aptitude_function: np.array) -> np.array:
+        """
+        Getting a child population, each child reproduced from the winner of a tournament with
+        the operator chosen by the scheduler. Each operator runs as one compiled batch, whose
+        CPU time is shared by its children. Schedulers with operators that are not compiled,
+        including custom ones registered under a built-in name, use the NumPy loop.
+
+        :param population: Numpy Array with all the population [[1 ... n], ... ,[1 ... n]]
+        :param aptitude_function: Numpy Array with all the aptitude functions for each chromosome
+        :return: Numpy Array with the child population [[1 ... n], ... ,[1 ... n]]
+        """
+        operators = self.operator_scheduler.operators
+        registry = self.operator_scheduler.registry
+        if any(name not in COMPILED_OPERATORS or registry[name] is not OPERATORS[name]
+               for name in operators):
+            return super().get_child_population(population, aptitude_function)
+
+        n_contenders = max(int(self.population_size * 0.05), 1)
+        selected = self.operator_scheduler.select(self.population_size)
+        order = np.argsort(selected, kind="stable")
+        child_population = np.empty((self.population_size, self.chromosome_size),
+                                    dtype=population.dtype)
+        winners = np.empty(self.population_size, dtype=np.int64)
+        cpu_times = np.empty(self.population_size)
+
+        start_index = 0
+        for operator, n_children in enumerate(np.bincount(selected, minlength=len(operators))):
+            if n_children == 0:
+                continue
+            indexes = order[start_index:start_index + n_children]
+            start = time.process_time()
+            child_population[indexes], winners[indexes] = get_child_population(
+                population, aptitude_function, n_contenders, n_children,
+                COMPILED_OPERATORS[operators[operator]])
+            cpu_times[indexes] = (time.process_time() - start) / n_children
+            start_index += n_children
+
+        # Crediting each operator with the improvement it achieved per CPU second
+        improvements = aptitude_function[winners] - self.get_aptitude_function(child_population)
+        self.operator_scheduler.update(selected, improvements, cpu_times)
+
+        return child_population
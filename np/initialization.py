@@ -0,0 +1,277 @@
+"""Contains the builders for the initial population of the genetic algorithm."""
+import numpy as np
+
+
+def get_random_population(population_size: int, chromosome_size: int) -> np.array:
+    """
+    Getting a population of uniformly random chromosomes.
+
+    :param population_size: Integer with the size of the population
+    :param chromosome_size: Integer with the size of the chromosome
+    :return: Numpy Array with the population [[1 ... n], ... ,[1 ... n]]
+    """
+    random_keys = np.random.random((population_size, chromosome_size))
+    population = np.argsort(random_keys, axis=1) + 1
+    return population.astype(np.min_scalar_type(chromosome_size))
+
+
+def get_nearest_neighbour_population(distance_matrix: np.array, population_size: int,
+                                     noise: float = 0.1) -> np.array:
+    """
+    Getting a population built with the randomized nearest neighbour heuristic. Every chromosome
+    starts from a random city and the distances are perturbed by up to 'noise' to vary the paths.
+
+    :param distance_matrix: Numpy Array with the distance between cities i and j at [i - 1, j - 1]
+    :param population_size: Integer with the size of the population
+    :param noise: Float with the maximum relative perturbation of the distances
+    :return: Numpy Array with the population [[1 ... n], ... ,[1 ... n]]
+    """
+    chromosome_size = len(distance_matrix)
+    rows = np.arange(population_size)
+    population = np.empty((population_size, chromosome_size), dtype=np.intp)
+    visited = np.zeros((population_size, chromosome_size), dtype=bool)
+
+    current = np.random.randint(0, chromosome_size, population_size)
+    for index in range(chromosome_size):
+        population[:, index] = current
+        visited[rows, current] = True
+        if index + 1 == chromosome_size:
+            break
+
+        distances = distance_matrix[current] * \
+            np.random.uniform(1, 1 + noise, (population_size, chromosome_size))
+        distances[visited] = np.inf
+        current = np.argmin(distances, axis=1)
+
+    return (population + 1).astype(np.min_scalar_type(chromosome_size))
+
+
+def get_candidate_edges(distance_matrix: np.array, neighbours: int = 10) -> tuple:
+    """
+    Getting the candidate edges of the greedy edge heuristic, the ones between each city and its
+    nearest 'neighbours'. Each edge is listed once.
+
+    :param distance_matrix: Numpy Array with the distance between cities i and j at [i - 1, j - 1]
+    :param neighbours: Integer with the number of candidate edges per city
+    :return: Tuple with the Numpy Arrays of the first city, the second city and the length of
+             each edge
+    """
+    chromosome_size = len(distance_matrix)
+    neighbours = min(neighbours, chromosome_size - 1)
+
+    nearest = np.argpartition(distance_matrix, neighbours, axis=1)[:, :neighbours + 1]
+    first = np.repeat(np.arange(chromosome_size), neighbours + 1)
+    second = nearest.ravel()
+    pairs = np.unique(np.minimum(first, second) * chromosome_size + np.maximum(first, second))
+    first, second = np.divmod(pairs, chromosome_size)
+    candidates = first != second
+    first, second = first[candidates], second[candidates]
+    return first, second, distance_matrix[first, second]
+
+
+def get_greedy_edge_chromosome(distance_matrix: np.array, neighbours: int = 10,
+                               noise: float = 0.0, candidate_edges: tuple = None) -> np.array:
+    """
+    Getting a chromosome with the greedy edge heuristic: the shortest edges are added while no
+    city gets more than two of them and no cycle is closed. Only the edges to the nearest
+    'neighbours' of each city are considered, the remaining fragments are joined by proximity.
+
+    :param distance_matrix: Numpy Array with the distance between cities i and j at [i - 1, j - 1]
+    :param neighbours: Integer with the number of candidate edges per city
+    :param noise: Float with the maximum relative perturbation of the edge lengths
+    :param candidate_edges: Tuple returned by 'get_candidate_edges', calculated when not given
+    :return: Numpy Array with the chromosome [1, ... , n]
+    """
+    chromosome_size = len(distance_matrix)
+    first, second, lengths = candidate_edges or get_candidate_edges(distance_matrix, neighbours)
+
+    # Candidate edges sorted by their perturbed length
+    if noise:
+        lengths = lengths * np.random.uniform(1, 1 + noise, len(lengths))
+    order = np.argsort(lengths, kind="stable")
+
+    degree = np.zeros(chromosome_size, dtype=np.uint8)
+    parent = list(range(chromosome_size))
+    adjacency = [[] for _ in range(chromosome_size)]
+
+    def find(city):
+        while parent[city] != city:
+            parent[city] = parent[parent[city]]
+            city = parent[city]
+        return city
+
+    edges = 0
+    for a, b in zip(first[order].tolist(), second[order].tolist()):
+        if degree[a] == 2 or degree[b] == 2:
+            continue
+        root_a, root_b = find(a), find(b)
+        if root_a == root_b:
+            continue
+        parent[root_a] = root_b
+        degree[a] += 1
+        degree[b] += 1
+        adjacency[a].append(b)
+        adjacency[b].append(a)
+        edges += 1
+        if edges + 1 == chromosome_size:
+            break
+
+    # Walking every fragment from one of its ends
+    fragments, seen = [], np.zeros(chromosome_size, dtype=bool)
+    for city in np.flatnonzero(degree < 2).tolist():
+        if seen[city]:
+            continue
+        fragment, previous = [city], -1
+        seen[city] = True
+        while True:
+            following = [n for n in adjacency[fragment[-1]] if n != previous]
+            if not following:
+                break
+            previous = fragment[-1]
+            fragment.append(following[0])
+            seen[following[0]] = True
+        fragments.append(fragment)
+
+    # Joining the fragments, each time with the one whose end is the closest
+    chromosome = fragments.pop(0)
+    while fragments:
+        heads = distance_matrix[chromosome[-1], [fragment[0] for fragment in fragments]]
+        tails = distance_matrix[chromosome[-1], [fragment[-1] for fragment in fragments]]
+        if heads.min() <= tails.min():
+            chromosome += fragments.pop(int(np.argmin(heads)))
+        else:
+            chromosome += fragments.pop(int(np.argmin(tails)))[::-1]
+
+    return np.array(chromosome, dtype=np.min_scalar_type(chromosome_size)) + 1
+
+
+def get_greedy_edge_population(distance_matrix: np.array, population_size: int,
+                               noise: float = 0.1) -> np.array:
+    """
+    Getting a population built with the greedy edge heuristic. The first chromosome uses the
+    real distances and the rest perturbed ones, so they are not all the same. The candidate
+    edges are found once, only their lengths are perturbed for each chromosome.
+
+    :param distance_matrix: Numpy Array with the distance between cities i and j at [i - 1, j - 1]
+    :param population_size: Integer with the size of the population
+    :param noise: Float with the maximum relative perturbation of the edge lengths
+    :return: Numpy Array with the population [[1 ... n], ... ,[1 ... n]]
+    """
+    candidate_edges = get_candidate_edges(distance_matrix)
+    return np.array([get_greedy_edge_chromosome(distance_matrix, noise=noise if index else 0.0,
+                                                candidate_edges=candidate_edges)
+                     for index in range(population_size)],
+                    dtype=np.min_scalar_type(len(distance_matrix)))
+
+
+def get_curve_index(x: np.array, y: np.array, order: int, curve: str = "hilbert") -> np.array:
+    """
+    Getting the position of grid points along a space-filling curve.
+
+    :param x: Numpy Array of integers in [0, 2 ** order) with the first coordinate
+    :param y: Numpy Array of integers in [0, 2 ** order) with the second coordinate
+    :param order: Integer with the number of bits of each coordinate
+    :param curve: String with the curve to follow, 'hilbert' or 'morton'
+    :return: Numpy Array with the distance of every point along the curve
+    """
+    x, y = x.astype(np.int64), y.astype(np.int64)
+    index = np.zeros(x.shape, dtype=np.int64)
+
+    if curve == "morton":
+        for bit in range(order):
+            index |= ((x >> bit) & 1) << (2 * bit)
+            index |= ((y >> bit) & 1) << (2 * bit + 1)
+        return index
+
+    if curve != "hilbert":
+        raise ValueError("Unknown curve '{}'".format(curve))
+
+    side = 1 << order
+    step = side >> 1
+    while step > 0:
+        rx = (x & step) > 0
+        ry = (y & step) > 0
+        index += step * step * ((3 * rx) ^ ry)
+
+        # Rotating the quadrant so the sub-curve is walked in the right direction
+        flip = ~ry & rx
+        x = np.where(flip, side - 1 - x, x)
+        y = np.where(flip, side - 1 - y, y)
+        x, y = np.where(ry, x, y), np.where(ry, y, x)
+        step >>= 1
+
+    return index
+
+
+def get_curve_population(coordinates: np.array, population_size: int, curve: str = "hilbert",
+                         order: int = 16) -> np.array:
+    """
+    Getting a population that visits the cities in the order of a space-filling curve.
+    Each chromosome lays the curve over the cities with a random rotation and offset.
+
+    :param coordinates: Numpy Array with the coordinates of the cities [[p1, p2], ...]
+    :param population_size: Integer with the size of the population
+    :param curve: String with the curve to follow, 'hilbert' or 'morton'
+    :param order: Integer with the number of bits of the curve grid per coordinate
+    :return: Numpy Array with the population [[1 ... n], ... ,[1 ... n]]
+    """
+    coordinates = np.asarray(coordinates, dtype=np.float64)
+    centered = coordinates - coordinates.mean(axis=0)
+
+    angles = np.random.uniform(0, 2 * np.pi, population_size)
+    angles[0] = 0
+    cos, sin = np.cos(angles)[:, np.newaxis], np.sin(angles)[:, np.newaxis]
+    x = cos * centered[:, 0] - sin * centered[:, 1]
+    y = sin * centered[:, 0] + cos * centered[:, 1]
+
+    # Scaling into the grid, leaving room for the random offset
+    scale = max(np.ptp(x, axis=1).max(), np.ptp(y, axis=1).max()) * 2 or 1
+    offset = np.random.uniform(0, 0.5, (2, population_size, 1))
+    offset[:, 0] = 0
+    side = (1 << order) - 1
+    x = ((x - x.min(axis=1, keepdims=True)) / scale + offset[0]) * side
+    y = ((y - y.min(axis=1, keepdims=True)) / scale + offset[1]) * side
+
+    index = get_curve_index(x.astype(np.int64), y.astype(np.int64), order, curve)
+    population = np.argsort(index, axis=1, kind="stable") + 1
+    return population.astype(np.min_scalar_type(len(coordinates)))
+
+
+def get_initial_population(coordinates: np.array, population_size: int,
+                           heuristic_ratio: float = 0.0, distance_matrix: np.array = None,
+                           curve: str = "hilbert") -> np.array:
+    """
+    Getting a population mixing random chromosomes with heuristic ones. The heuristic part is
+    split between nearest neighbour, greedy edge and space-filling curve chromosomes.
+
+    :param coordinates: Numpy Array with the coordinates of the cities [[p1, p2], ...]
+    :param population_size: Integer with the size of the population
+    :param heuristic_ratio: Float in [0, 1] with the portion of heuristic chromosomes
+    :param distance_matrix: Numpy Array with the distance between cities i and j at [i - 1, j - 1].
+                            It is calculated from the coordinates when not given.
+    :param curve: String with the space-filling curve to follow, 'hilbert' or 'morton'
+    :return: Numpy Array with the population [[1 ... n], ... ,[1 ... n]]
+    """
+    if not 0 <= heuristic_ratio <= 1:
+        raise ValueError("The variable 'heuristic_ratio' must be between 0 and 1")
+
+    coordinates = np.asarray(coordinates, dtype=np.float32)
+    chromosome_size = len(coordinates)
+    n_heuristic = int(round(population_size * heuristic_ratio)) if chromosome_size > 1 else 0
+    populations = [get_random_population(population_size - n_heuristic, chromosome_size)]
+
+    if n_heuristic:
+        if distance_matrix is None:
+            difference = coordinates[:, np.newaxis, :] - coordinates[np.newaxis, :, :]
+            distance_matrix = np.sqrt((difference ** 2).sum(axis=2))
+
+        n_greedy = n_curve = n_heuristic // 3
+        n_nearest = n_heuristic - n_greedy - n_curve
+        populations.append(get_nearest_neighbour_population(distance_matrix, n_nearest))
+        if n_greedy:
+            populations.append(get_greedy_edge_population(distance_matrix, n_greedy))
+        if n_curve:
+            populations.append(get_curve_population(coordinates, n_curve, curve=curve))
+
+    dtype = np.min_scalar_type(chromosome_size)
+    return np.concatenate([population.astype(dtype) for population in populations])
@@ -0,0 +1,221 @@
+"""Contains the mutation operators and the schedulers that choose between them."""
+import abc
+import numpy as np
+
+
+OPERATORS = {}
+
+
+def register_operator(name: str):
+    """
+    Decorator adding a mutation operator to the registry.
+
+    :param name: String with the name of the operator
+    """
+    def decorator(operator):
+        OPERATORS[name] = operator
+        return operator
+    return decorator
+
+
+@register_operator("reversal")
+def reversal(chromosome: np.array) -> np.array:
+    """
+    Reversing a chunk from the chromosome -> [1,2,3,4,5] -> [1,4,3,2,5]
+
+    :param chromosome: Numpy Array with the number (tag) of cities [1, ... , 14]
+    :return: Numpy Array with the child chromosome
+    """
+    child_chromosome = np.copy(chromosome)
+    if len(chromosome) < 2:
+        return child_chromosome
+
+    start_index = np.random.randint(0, len(chromosome) - 1)
+    end_index = np.random.randint(start_index, len(chromosome))
+    child_chromosome[start_index:end_index + 1] = chromosome[start_index:end_index + 1][::-1]
+
+    return child_chromosome
+
+
+@register_operator("segment_swap")
+def segment_swap(chromosome: np.array) -> np.array:
+    """
+    Swapping two chunks of the same size -> [1,2,3,4,5,6] -> [4,5,3,1,2,6]
+    Chromosomes shorter than 5 genes are reversed instead.
+
+    :param chromosome: Numpy Array with the number (tag) of cities [1, ... , 14]
+    :return: Numpy Array with the child chromosome
+    """
+    size = len(chromosome)
+    if size < 5:
+        return reversal(chromosome)
+
+    while True:
+        start_index_a = np.random.randint(0, size - 4)
+        end_index_a = np.random.randint(start_index_a + 1, size - 3)
+        chunk_size = end_index_a - start_index_a
+        if end_index_a + 1 >= size - chunk_size:
+            continue  # Try again
+        start_index_b = np.random.randint(end_index_a + 1, size - chunk_size)
+        end_index_b = start_index_b + chunk_size
+        if end_index_b < size:
+            break  # Everything went ok
+
+    child_chromosome = np.copy(chromosome)
+    child_chromosome[start_index_a:end_index_a + 1] = chromosome[start_index_b:end_index_b + 1]
+    child_chromosome[start_index_b:end_index_b + 1] = chromosome[start_index_a:end_index_a + 1]
+
+    return child_chromosome
+
+
+@register_operator("insertion")
+def insertion(chromosome: np.array) -> np.array:
+    """
+    Moving a single gene to another position -> [1,2,3,4,5] -> [1,3,4,2,5]
+
+    :param chromosome: Numpy Array with the number (tag) of cities [1, ... , 14]
+    :return: Numpy Array with the child chromosome
+    """
+    if len(chromosome) < 2:
+        return np.copy(chromosome)
+
+    source_index, target_index = np.random.choice(len(chromosome), 2, replace=False)
+    return np.insert(np.delete(chromosome, source_index), target_index, chromosome[source_index])
+
+
+@register_operator("or_opt")
+def or_opt(chromosome: np.array) -> np.array:
+    """
+    Moving a chunk of 1 to 3 genes to another position, reversing it half of the times
+    -> [1,2,3,4,5,6] -> [1,4,5,3,2,6]
+
+    :param chromosome: Numpy Array with the number (tag) of cities [1, ... , 14]
+    :return: Numpy Array with the child chromosome
+    """
+    size = len(chromosome)
+    if size < 3:
+        return reversal(chromosome)
+
+    chunk_size = np.random.randint(1, min(3, size - 2) + 1)
+    start_index = np.random.randint(0, size - chunk_size + 1)
+    chunk = chromosome[start_index:start_index + chunk_size]
+    if np.random.randint(0, 2):
+        chunk = chunk[::-1]
+
+    rest = np.delete(chromosome, np.arange(start_index, start_index + chunk_size))
+    target_index = np.random.randint(0, len(rest))  # Any place but the original one
+    if target_index >= start_index:
+        target_index += 1
+
+    return np.concatenate((rest[:target_index], chunk, rest[target_index:]))
+
+
+@register_operator("double_bridge")
+def double_bridge(chromosome: np.array) -> np.array:
+    """
+    Cutting the chromosome in 4 chunks A B C D and joining them as A C B D
+    -> [1,2,3,4,5,6] -> [1,4,5,2,3,6]
+
+    :param chromosome: Numpy Array with the number (tag) of cities [1, ... , 14]
+    :return: Numpy Array with the child chromosome
+    """
+    if len(chromosome) < 4:
+        return reversal(chromosome)
+
+    first, second, third = np.sort(np.random.choice(np.arange(1, len(chromosome)), 3,
+                                                    replace=False))
+    return np.concatenate((chromosome[:first], chromosome[second:third],
+                           chromosome[first:second], chromosome[third:]))
+
+
+class OperatorScheduler(abc.ABC):
+    """Base class choosing mutation operators with probabilities learned from their yield."""
+
+    def __init__(self, operators: list = None, p_min: float = None, alpha: float = 0.3,
+                 registry: dict = None):
+        """
+        :param operators: List with the names of the registered operators to choose from,
+                          by default all of them
+        :param p_min: Float with the minimum probability of any operator, so none is discarded
+        :param alpha: Float in (0, 1] with the adaptation rate of the operator qualities
+        :param registry: Dictionary with the operators by name, by default 'OPERATORS'
+        """
+        self.registry = OPERATORS if registry is None else registry
+        self.operators = list(operators or self.registry)
+        unknown = [name for name in self.operators if name not in self.registry]
+        if unknown:
+            raise ValueError("Unknown operators {}, choose from {}".format(unknown,
+                                                                           list(self.registry)))
+
+        count = len(self.operators)
+        self.p_min = 0.2 / count if p_min is None else p_min
+        self.alpha = alpha
+        self.quality = np.ones(count)
+        self.probabilities = np.full(count, 1 / count)
+
+    def select(self, size: int) -> np.array:
+        """
+        Choosing the operators for a batch of reproductions.
+
+        :param size: Integer with the number of operators to choose
+        :return: Numpy Array with the indexes of the operators in 'operators'
+        """
+        return np.random.choice(len(self.operators), size, p=self.probabilities)
+
+    def update(self, selected: np.array, improvements: np.array, cpu_times: np.array):
+        """
+        Rewarding each operator used in the batch with its improvement per CPU second.
+
+        :param selected: Numpy Array with the indexes of the operators applied
+        :param improvements: Numpy Array with the decrease of the aptitude function of each child
+        :param cpu_times: Numpy Array with the CPU seconds spent by each operator call
+        """
+        count = len(self.operators)
+        gains = np.bincount(selected, weights=np.maximum(improvements, 0), minlength=count)
+        costs = np.bincount(selected, weights=cpu_times, minlength=count)
+        used = np.bincount(selected, minlength=count) > 0
+
+        rewards = gains[used] / np.maximum(costs[used], 1e-9)
+        self.quality[used] += self.alpha * (rewards - self.quality[used])
+        self.probabilities = self.get_probabilities()
+
+    @abc.abstractmethod
+    def get_probabilities(self) -> np.array:
+        """Calculating the selection probabilities from the operator qualities."""
+
+
+class ProbabilityMatching(OperatorScheduler):
+    """Choosing each operator proportionally to its quality."""
+
+    def get_probabilities(self) -> np.array:
+        """Calculating the selection probabilities from the operator qualities."""
+        count = len(self.operators)
+        total = self.quality.sum()
+        if total <= 0:
+            return np.full(count, 1 / count)
+        return self.p_min + (1 - count * self.p_min) * self.quality / total
+
+
+class AdaptivePursuit(OperatorScheduler):
+    """Moving the probabilities towards the operator with the best quality."""
+
+    def __init__(self, operators: list = None, p_min: float = None, alpha: float = 0.3,
+                 beta: float = 0.3, registry: dict = None):
+        """
+        :param operators: List with the names of the registered operators to choose from,
+                          by default all of them
+        :param p_min: Float with the minimum probability of any operator, so none is discarded
+        :param alpha: Float in (0, 1] with the adaptation rate of the operator qualities
+        :param beta: Float in (0, 1] with the adaptation rate of the probabilities
+        :param registry: Dictionary with the operators by name, by default 'OPERATORS'
+        """
+        super().__init__(operators, p_min, alpha, registry)
+        self.beta = beta
+
+    def get_probabilities(self) -> np.array:
+        """Calculating the selection probabilities from the operator qualities."""
+        count = len(self.operators)
+        target = np.full(count, self.p_min)
+        target[np.argmax(self.quality)] = 1 - (count - 1) * self.p_min
+        probabilities = self.probabilities + self.beta * (target - self.probabilities)
+        return probabilities / probabilities.sum()
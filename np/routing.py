@@ -0,0 +1,435 @@
+"""Contains the multi-vehicle version of the traveler services (mTSP / CVRP).
+
+A chromosome is a giant tour over the customers. The routes are obtained by splitting it:
+every route leaves the depot, visits a consecutive chunk of the giant tour and comes back.
+The split points of each chromosome are kept in a boolean array marking the first customer
+of every route, so route-aware mutations only re-score the routes they touch.
+"""
+import math
+import time
+from collections import deque
+import numpy as np
+from .operators import AdaptivePursuit, reversal
+from .services import TravelerServices
+
+
+ROUTE_OPERATORS = {}
+
+
+def register_route_operator(name: str):
+    """
+    Decorator adding a route-aware mutation operator to the registry. The operators receive
+    (services, chromosome, route_starts, aptitude_function) and return the child chromosome,
+    its route starts and its aptitude function.
+
+    :param name: String with the name of the operator
+    """
+    def decorator(operator):
+        ROUTE_OPERATORS[name] = operator
+        return operator
+    return decorator
+
+
+def split(tour_distances: list, depot_distances: list, loads: list, capacity: float,
+          vehicles: int = None, penalty: float = 0.0) -> tuple:
+    """
+    Optimal split of a giant tour into routes that respect the capacity.
+    The cost of a route from position i to j - 1 is depot_distances[i] + tour_distances[j - 1]
+    - tour_distances[i] + depot_distances[j - 1], so keeping a sliding window minimum of
+    'cost[i] + depot_distances[i] - tour_distances[i]' over the feasible i gives O(N).
+
+    Without 'vehicles' the fleet is unlimited. With it the split is done by number of routes used,
+    one O(N) layer per vehicle. When the tour cannot be served by that fleet, the unlimited split
+    is returned adding 'penalty' for every extra route.
+
+    :param tour_distances: List with the distance along the giant tour up to each position
+    :param depot_distances: List with the distance between the depot and each position
+    :param loads: List with the accumulated demand before each position, one more than the tour
+    :param capacity: Float with the capacity of each vehicle
+    :param vehicles: Integer with the maximum number of routes, by default unlimited
+    :param penalty: Float added for every route over 'vehicles'
+    :return: Tuple with the cost of the routes and the list of positions where routes start
+    """
+    size = len(depot_distances)
+    if vehicles is not None:
+        cost = [0.0] + [math.inf] * size  # Cost with the routes used so far, none at first
+        predecessors = []
+        best_cost, best_routes = math.inf, 0
+        for routes in range(1, vehicles + 1):
+            cost, predecessor = _split_layer(cost, tour_distances, depot_distances, loads,
+                                             capacity)
+            predecessors.append(predecessor)
+            if cost[size] < best_cost:
+                best_cost, best_routes = cost[size], routes
+
+        if best_routes:
+            route_starts, j = [], size
+            for predecessor in predecessors[best_routes - 1::-1]:
+                j = predecessor[j]
+                route_starts.append(j)
+            return best_cost, route_starts[::-1]
+
+    cost = [0.0] * (size + 1)
+    predecessor = [0] * (size + 1)
+    window = deque()
+
+    for j in range(1, size + 1):
+        # Position j - 1 may start the last route from now on
+        i = j - 1
+        key = cost[i] + depot_distances[i] - tour_distances[i]
+        while window and window[-1][0] >= key:
+            window.pop()
+        window.append((key, i))
+
+        # Routes starting at the front would exceed the capacity
+        while loads[j] - loads[window[0][1]] > capacity:
+            window.popleft()
+
+        key, i = window[0]
+        cost[j] = key + tour_distances[j - 1] + depot_distances[j - 1]
+        predecessor[j] = i
+
+    route_starts, j = [], size
+    while j > 0:
+        j = predecessor[j]
+        route_starts.append(j)
+
+    if vehicles is not None:
+        cost[size] += penalty * (len(route_starts) - vehicles)
+    return cost[size], route_starts[::-1]
+
+
+def _split_layer(previous_cost: list, tour_distances: list, depot_distances: list, loads: list,
+                 capacity: float) -> tuple:
+    """
+    Adding one more route to the split: the cost of serving the first j customers with exactly
+    one route more than 'previous_cost', with the same sliding window minimum as 'split'.
+
+    :param previous_cost: List with the cost of serving the first i customers, math.inf if
+                          it is not possible
+    :return: Tuple with the list of costs and the list of the position where the last route starts
+    """
+    size = len(depot_distances)
+    cost = [math.inf] * (size + 1)
+    predecessor = [0] * (size + 1)
+    window = deque()
+
+    for j in range(1, size + 1):
+        i = j - 1
+        if previous_cost[i] < math.inf:
+            key = previous_cost[i] + depot_distances[i] - tour_distances[i]
+            while window and window[-1][0] >= key:
+                window.pop()
+            window.append((key, i))
+
+        while window and loads[j] - loads[window[0][1]] > capacity:
+            window.popleft()
+
+        if window:
+            key, i = window[0]
+            cost[j] = key + tour_distances[j - 1] + depot_distances[j - 1]
+            predecessor[j] = i
+
+    return cost, predecessor
+
+
+@register_route_operator("route_reversal")
+def route_reversal(services, chromosome: np.array, route_starts: np.array,
+                   aptitude_function: float) -> tuple:
+    """Reversing a chunk inside a single route, only that route is re-scored."""
+    bounds = services.get_route_bounds(route_starts)
+    candidates = np.flatnonzero(bounds[1:] - bounds[:-1] > 1)
+    if len(candidates) == 0:
+        return chromosome, route_starts, aptitude_function
+
+    route = np.random.choice(candidates)
+    start, end = bounds[route], bounds[route + 1]
+    child_chromosome = np.copy(chromosome)
+    child_chromosome[start:end] = reversal(chromosome[start:end])
+
+    aptitude_function += services.get_route_cost(child_chromosome[start:end]) - \
+        services.get_route_cost(chromosome[start:end])
+    return child_chromosome, route_starts, aptitude_function
+
+
+@register_route_operator("route_swap")
+def route_swap(services, chromosome: np.array, route_starts: np.array,
+               aptitude_function: float) -> tuple:
+    """Swapping two customers of different routes when both capacities allow it."""
+    bounds = services.get_route_bounds(route_starts)
+    if len(bounds) < 3:
+        return chromosome, route_starts, aptitude_function
+
+    index_a, index_b = np.random.choice(len(chromosome), 2, replace=False)
+    route_a, route_b = np.searchsorted(bounds, [index_a, index_b], side="right") - 1
+    if route_a == route_b:
+        return chromosome, route_starts, aptitude_function
+
+    demand_a, demand_b = services.demands[chromosome[[index_a, index_b]]]
+    slice_a, slice_b = slice(bounds[route_a], bounds[route_a + 1]), \
+        slice(bounds[route_b], bounds[route_b + 1])
+    if services.demands[chromosome[slice_a]].sum() - demand_a + demand_b > services.capacity or \
+            services.demands[chromosome[slice_b]].sum() - demand_b + demand_a > services.capacity:
+        return chromosome, route_starts, aptitude_function
+
+    child_chromosome = np.copy(chromosome)
+    child_chromosome[index_a], child_chromosome[index_b] = chromosome[index_b], chromosome[index_a]
+
+    aptitude_function += services.get_route_cost(child_chromosome[slice_a]) + \
+        services.get_route_cost(child_chromosome[slice_b]) - \
+        services.get_route_cost(chromosome[slice_a]) - services.get_route_cost(chromosome[slice_b])
+    return child_chromosome, route_starts, aptitude_function
+
+
+@register_route_operator("route_relocate")
+def route_relocate(services, chromosome: np.array, route_starts: np.array,
+                   aptitude_function: float) -> tuple:
+    """Moving a customer to the cheapest position of another route with enough capacity."""
+    bounds = services.get_route_bounds(route_starts)
+    index = np.random.randint(0, len(chromosome))
+    customer = chromosome[index]
+    source = np.searchsorted(bounds, index, side="right") - 1
+
+    routes = np.split(chromosome, bounds[1:-1])
+    loads = np.add.reduceat(services.demands[chromosome], bounds[:-1])
+    candidates = np.flatnonzero(loads + services.demands[customer] <= services.capacity)
+    candidates = candidates[candidates != source]
+    if len(candidates) == 0:
+        return chromosome, route_starts, aptitude_function
+    target = np.random.choice(candidates)
+
+    # Cheapest position in the target route, the depot closes both ends
+    stops = np.concatenate(([0], routes[target], [0]))
+    distance_matrix = services.distance_matrix
+    costs = distance_matrix[stops[:-1], customer] + distance_matrix[customer, stops[1:]] - \
+        distance_matrix[stops[:-1], stops[1:]]
+    position = int(np.argmin(costs))
+
+    source_route = np.delete(routes[source], index - bounds[source])
+    target_route = np.insert(routes[target], position, customer)
+    aptitude_function += services.get_route_cost(source_route) + \
+        services.get_route_cost(target_route) - services.get_route_cost(routes[source]) - \
+        services.get_route_cost(routes[target])
+
+    if len(source_route) == 0 and services.vehicles and len(routes) > services.vehicles:
+        aptitude_function -= services.route_penalty  # One route less over the fleet size
+
+    routes[source], routes[target] = source_route, target_route
+    routes = [route for route in routes if len(route)]
+    child_chromosome = np.concatenate(routes)
+    child_route_starts = np.zeros(len(child_chromosome), dtype=bool)
+    child_route_starts[np.cumsum([0] + [len(route) for route in routes[:-1]])] = True
+    return child_chromosome, child_route_starts, aptitude_function
+
+
+@register_route_operator("tour_reversal")
+def tour_reversal(services, chromosome: np.array, route_starts: np.array,
+                  aptitude_function: float) -> tuple:
+    """Reversing a chunk of the giant tour and splitting it again, every route is re-scored."""
+    child_chromosome = reversal(chromosome)
+    aptitude_functions, child_route_starts = services.split_population(child_chromosome[np.newaxis])
+    return child_chromosome, child_route_starts[0], aptitude_functions[0]
+
+
+class VehicleRoutingServices(TravelerServices):
+    """Traveler services for several vehicles leaving from and returning to a depot."""
+
+    def __init__(self, population_size: int, coordinates: list, depot: tuple,
+                 demands: list = None, capacity: float = None, vehicles: int = None,
+                 heuristic_ratio: float = 0.0, operator_scheduler=None):
+        """
+        param population_size: Integer with the size of population
+        param coordinates: List of tuples with the coordinates for each customer -> [(p1,p2), ...]
+        param depot: Tuple with the coordinate of the depot (p1, p2)
+        param demands: List with the demand of each customer, by default 1 for everyone
+        param capacity: Float with the capacity of each vehicle. By default the total demand
+                        divided by 'vehicles', so with unit demands no vehicle serves more than
+                        its share of the customers (mTSP). That share is recalculated when
+                        customers are added or removed.
+        param vehicles: Integer with the maximum number of routes, by default unlimited. Giant
+                        tours that cannot be split into that many routes are penalised with
+                        an upper bound of the cost of any solution for every extra route.
+        param heuristic_ratio: Float in [0, 1] with the portion of the initial population built
+                               with heuristics instead of random permutations
+        param operator_scheduler: OperatorScheduler choosing between the route operators, by
+                                  default an AdaptivePursuit over all of them
+        """
+        demands = np.ones(len(coordinates)) if demands is None else np.asarray(demands, dtype=float)
+        if capacity is None and vehicles is None:
+            raise ValueError("Either 'capacity' or 'vehicles' must be given")
+        if len(demands) != len(coordinates):
+            raise ValueError("The size of 'demands' must be equal to the size of 'coordinates'")
+
+        self.shared_capacity = capacity is None  # Recalculated when customers change
+        self.capacity = capacity
+        self.vehicles = vehicles
+        # The depot takes the unused tag 0, so its distances are row/column 0 of the matrix
+        self.set_demands(np.concatenate(([0.0], demands)))
+        self.route_penalty = 0.0
+        self.scored_population = None
+        self.scored_aptitude_function = None
+        self.route_starts = None
+
+        super().__init__(population_size, coordinates, heuristic_ratio,
+                         operator_scheduler or AdaptivePursuit(registry=ROUTE_OPERATORS))
+        self.update_distances(0, depot)
+
+    def set_demands(self, demands: np.array):
+        """
+        Replace the demands, recalculating the capacity when it is the share of the total demand
+        of each vehicle. Nothing changes if the vehicles cannot serve every customer.
+
+        :param demands: Numpy Array with the demand of each tag, 0 for the depot
+        """
+        total_demand = demands.sum()
+        capacity = math.ceil(total_demand / self.vehicles) if self.shared_capacity else \
+            self.capacity
+        if demands.max(initial=0) > capacity:
+            raise ValueError("A demand is bigger than the capacity of the vehicles")
+        if self.vehicles is not None and capacity * self.vehicles < total_demand:
+            raise ValueError("The total demand is bigger than the capacity of all the vehicles")
+        self.demands, self.capacity = demands, capacity
+
+    def get_aptitude_function(self, population: np.array) -> np.array:
+        """
+        Calculate the total distance of the optimal routes of each chromosome.
+
+        :param population: Numpy Array with all the population [[1 ... n], ... ,[1 ... n]]
+        :return: Numpy Array with all the aptitude functions for each chromosome
+        """
+        return self.split_population(population)[0]
+
+    def split_population(self, population: np.array) -> tuple:
+        """
+        Split every chromosome into its optimal routes. The distance and load prefix sums are
+        calculated for the whole population at once, only the O(N) split runs per chromosome.
+
+        :param population: Numpy Array with all the population [[1 ... n], ... ,[1 ... n]]
+        :return: Tuple with the Numpy Array of aptitude functions and the Numpy Array marking
+                 the first customer of every route
+        """
+        rows, columns = population.shape
+        tour_distances = np.zeros((rows, columns))
+        np.cumsum(self.distance_matrix[population[:, :-1], population[:, 1:]], axis=1,
+                  out=tour_distances[:, 1:])
+        depot_distances = self.distance_matrix[0, population]
+        loads = np.zeros((rows, columns + 1))
+        np.cumsum(self.demands[population], axis=1, out=loads[:, 1:])
+
+        # No solution has more than 2N edges, each at most twice as long as the farthest customer
+        penalty = 4 * columns * depot_distances.max(initial=0) if self.vehicles else 0.0
+        self.route_penalty = penalty
+
+        aptitude_function = np.empty(rows, dtype=np.float32)
+        route_starts = np.zeros((rows, columns), dtype=bool)
+        for row in range(rows):
+            aptitude_function[row], starts = split(tour_distances[row].tolist(),
+                                                   depot_distances[row].tolist(),
+                                                   loads[row].tolist(), self.capacity,
+                                                   self.vehicles, penalty)
+            route_starts[row, starts] = True
+
+        return aptitude_function, route_starts
+
+    @staticmethod
+    def get_route_bounds(route_starts: np.array) -> np.array:
+        """
+        Getting the positions where each route starts plus the size of the chromosome.
+
+        :param route_starts: Numpy Array marking the first customer of every route
+        :return: Numpy Array with the bounds, route r is chromosome[bounds[r]:bounds[r + 1]]
+        """
+        return np.append(np.flatnonzero(route_starts), len(route_starts))
+
+    def get_route_cost(self, route: np.array) -> float:
+        """
+        Calculate the distance of a single route, from the depot back to the depot.
+
+        :param route: Numpy Array with the customers of the route
+        :return: Float with the distance of the route
+        """
+        if len(route) == 0:
+            return 0.0
+        return float(self.distance_matrix[0, route[0]] + self.distance_matrix[route[-1], 0] +
+                     self.distance_matrix[route[:-1], route[1:]].sum())
+
+    def get_routes(self, chromosome: np.array) -> list:
+        """
+        Getting the optimal routes of a chromosome.
+
+        :param chromosome: Numpy Array with the number (tag) of the customers [1, ... , n]
+        :return: List of Lists with the customers of each route
+        """
+        route_starts = self.split_population(np.array([chromosome]))[1][0]
+        bounds = self.get_route_bounds(route_starts)
+        return [chromosome[bounds[r]:bounds[r + 1]].tolist() for r in range(len(bounds) - 1)]
+
+    def get_next_generation(self, population: np.array) -> np.array:
+        """
+        Getting the next population based on a parent one and saving the best chromosome.
+        The routes of the children are derived from the routes of their parents.
+
+        :param population: Numpy Array with all the population [[1 ... n], ... ,[1 ... n]]
+        """
+        if population is not self.scored_population:
+            self.scored_aptitude_function, self.route_starts = self.split_population(population)
+        aptitude_function = self.scored_aptitude_function
+
+        # Tournaments for every child at once
+        n_contenders = max(int(self.population_size * 0.05), 1)
+        contenders = np.random.randint(0, len(population), (self.population_size, n_contenders))
+        winners = contenders[np.arange(self.population_size),
+                             np.argmin(aptitude_function[contenders], axis=1)]
+
+        shape = (self.population_size, self.chromosome_size)
+        child_population = np.empty(shape, dtype=population.dtype)
+        child_route_starts = np.empty(shape, dtype=bool)
+        child_aptitude_function = np.empty(self.population_size, dtype=np.float32)
+        selected = self.operator_scheduler.select(self.population_size)
+        cpu_times = np.empty(self.population_size)
+        scheduler = self.operator_scheduler
+        operators = [scheduler.registry[name] for name in scheduler.operators]
+
+        for i, winner in enumerate(winners):
+            operator = operators[selected[i]]
+            start = time.process_time()
+            child_population[i], child_route_starts[i], child_aptitude_function[i] = operator(
+                self, population[winner], self.route_starts[winner], aptitude_function[winner])
+            cpu_times[i] = time.process_time() - start
+
+        self.operator_scheduler.update(selected, aptitude_function[winners] -
+                                       child_aptitude_function, cpu_times)
+
+        self.scored_population = child_population
+        self.scored_aptitude_function = child_aptitude_function
+        self.route_starts = child_route_starts
+        self.save_best_chromosome(child_population, child_aptitude_function)
+
+        return child_population, child_aptitude_function
+
+    def add_city(self, coordinate: tuple, demand: float = 1) -> int:
+        """
+        Add a customer to the live instance, inserting it at its cheapest position in every
+        chromosome.
+
+        :param coordinate: Tuple with the coordinate of the new customer (p1, p2)
+        :param demand: Float with the demand of the new customer
+        :return: Integer with the number (tag) assigned to the new customer
+        """
+        self.set_demands(np.append(self.demands, demand))
+        return super().add_city(coordinate)
+
+    def remove_city(self, city: int):
+        """
+        Remove a customer from the live instance, dropping it from every chromosome.
+        The customer with the highest number takes the tag of the removed one.
+
+        :param city: Integer with the number (tag) of the customer to remove
+        """
+        if city not in self.mapping_table:
+            raise ValueError("The city {} does not exist".format(city))
+        demands = self.demands[:-1].copy()
+        if city != self.chromosome_size:  # The last customer takes the tag of the removed one
+            demands[city] = self.demands[-1]
+        self.set_demands(demands)
+        super().remove_city(city)
@@ -1,6 +1,7 @@
+import time
 import numpy as np
-import math
-import matplotlib.pyplot as plt
+from .initialization import get_initial_population
+from .operators import AdaptivePursuit
 
 
 class TravelerServices:
@@ -10,10 +11,15 @@ class TravelerServices:
     random_population = None
     best_chromosome = list()  # [chromosome, aptitude_function]
 
-    def __init__(self, population_size: int, coordinates: list):
+    def __init__(self, population_size: int, coordinates: list, heuristic_ratio: float = 0.0,
+                 operator_scheduler=None):
         """
         param population_size: Integer with the size of population
         param coordinates: List of tuples with the coordinates for each city -> [(p1,p2), ...]
+        param heuristic_ratio: Float in [0, 1] with the portion of the initial population built
+                               with heuristics instead of random permutations
+        param operator_scheduler: OperatorScheduler choosing the mutation operators, by default
+                                  an AdaptivePursuit over all the registered operators
         """
         cities = [city for city in range(1, len(coordinates) + 2)]
         self.mapping_table = {city: coordinate for city, coordinate in zip(cities, coordinates)}
@@ -21,19 +27,170 @@ class TravelerServices:
         self.population_size = population_size
         self.chromosome_size = len(coordinates)
 
-        self.random_population = np.empty((0, self.chromosome_size), dtype=np.uint8)
-        random_chromosome = np.arange(1, self.chromosome_size + 1, dtype=np.uint8)
-        for _ in range(0, self.population_size):
-            np.random.shuffle(random_chromosome)
-            self.random_population = np.append(self.random_population, [random_chromosome], axis=0)
+        # Row/column 0 is unused so genes (city tags) can index the arrays directly
+        self.coordinates = np.zeros((self.chromosome_size + 1, 2), dtype=np.float32)
+        self.coordinates[1:] = coordinates
+        self.distance_matrix = self.get_distance_matrix(self.coordinates)
+
+        self.random_population = get_initial_population(self.coordinates[1:], self.population_size,
+                                                        heuristic_ratio,
+                                                        distance_matrix=self.distance_matrix[1:, 1:])
+        self.population = self.random_population
+        self.operator_scheduler = operator_scheduler or AdaptivePursuit()
 
     def run(self, generations: int):
-        """"""
-        parent_population = self.random_population
+        """
+        Evolve the current population. Calling it again continues from the last generation,
+        which is how a solver is re-optimized after 'add_city', 'remove_city' or 'move_city'.
+
+        :param generations: Integer with the number of generations to evolve
+        """
+        parent_population = self.population
         for generation in range(1, generations + 1):
             child_population, aptitude_function = self.get_next_generation(parent_population)
             # traveler.graph(child_population, aptitude_function)
             parent_population = child_population
+        self.population = parent_population
+
+    @staticmethod
+    def get_distance_matrix(coordinates: np.array) -> np.array:
+        """
+        Calculate the distances between every pair of points.
+
+        :param coordinates: Numpy Array with the coordinates of the points [[p1, p2], ...]
+        :return: Numpy Array with the distance between points i and j at [i, j]
+        """
+        difference = coordinates[:, np.newaxis, :] - coordinates[np.newaxis, :, :]
+        return np.sqrt((difference ** 2).sum(axis=2), dtype=np.float32)
+
+    def add_city(self, coordinate: tuple) -> int:
+        """
+        Add a city to the live instance, inserting it at its cheapest position in every chromosome.
+
+        :param coordinate: Tuple with the coordinate of the new city (p1, p2)
+        :return: Integer with the number (tag) assigned to the new city
+        """
+        city = self.chromosome_size + 1
+        if city >= len(self.coordinates):
+            # Growing by an eighth keeps inserts amortized O(N) while the N x N matrix only
+            # needs about 27% more memory, doubling would quadruple it
+            capacity = city + max(city // 8, 16)
+            coordinates = np.zeros((capacity, 2), dtype=np.float32)
+            coordinates[:city] = self.coordinates
+            distance_matrix = np.zeros((capacity, capacity), dtype=np.float32)
+            distance_matrix[:city, :city] = self.distance_matrix
+            self.coordinates, self.distance_matrix = coordinates, distance_matrix
+
+        self.chromosome_size = city
+        self.mapping_table[city] = coordinate
+        self.update_distances(city, coordinate)
+
+        dtype = np.promote_types(self.population.dtype, np.min_scalar_type(city))
+        self.population = self.insert_city(self.population.astype(dtype), city)
+        self.repair_best_chromosome(lambda population: self.insert_city(population.astype(dtype), city))
+
+        return city
+
+    def remove_city(self, city: int):
+        """
+        Remove a city from the live instance, dropping it from every chromosome.
+        The city with the highest number takes the tag of the removed one so tags stay contiguous.
+
+        :param city: Integer with the number (tag) of the city to remove
+        """
+        if city not in self.mapping_table:
+            raise ValueError("The city {} does not exist".format(city))
+
+        last_city = self.chromosome_size
+
+        def remove(population):
+            population = population[population != city].reshape(len(population), -1)
+            population[population == last_city] = city
+            return population
+
+        if city != last_city:
+            self.mapping_table[city] = self.mapping_table[last_city]
+            self.coordinates[city] = self.coordinates[last_city]
+            self.distance_matrix[city, :last_city] = self.distance_matrix[last_city, :last_city]
+            self.distance_matrix[:last_city, city] = self.distance_matrix[:last_city, last_city]
+            self.distance_matrix[city, city] = 0
+        del self.mapping_table[last_city]
+        self.chromosome_size = last_city - 1
+
+        self.population = remove(self.population)
+        self.repair_best_chromosome(remove)
+
+    def move_city(self, city: int, coordinate: tuple):
+        """
+        Change the coordinate of a city, moving it to its cheapest position in every chromosome.
+
+        :param city: Integer with the number (tag) of the city to move
+        :param coordinate: Tuple with the new coordinate of the city (p1, p2)
+        """
+        if city not in self.mapping_table:
+            raise ValueError("The city {} does not exist".format(city))
+
+        self.mapping_table[city] = coordinate
+        self.update_distances(city, coordinate)
+
+        def move(population):
+            population = population[population != city].reshape(len(population), -1)
+            return self.insert_city(population, city)
+
+        self.population = move(self.population)
+        self.repair_best_chromosome(move)
+
+    def update_distances(self, city: int, coordinate: tuple):
+        """
+        Recalculate the row and column of the distance matrix for a single city.
+
+        :param city: Integer with the number (tag) of the city
+        :param coordinate: Tuple with the coordinate of the city (p1, p2)
+        """
+        size = self.chromosome_size + 1
+        self.coordinates[city] = coordinate
+        difference = self.coordinates[:size] - self.coordinates[city]
+        distances = np.sqrt((difference ** 2).sum(axis=1), dtype=np.float32)
+        self.distance_matrix[city, :size] = distances
+        self.distance_matrix[:size, city] = distances
+
+    def insert_city(self, population: np.array, city: int) -> np.array:
+        """
+        Insert a city in each chromosome at the position that increases its distance the least.
+
+        :param population: Numpy Array with all the population without the city [[1 ... n], ...]
+        :param city: Integer with the number (tag) of the city to insert
+        :return: Numpy Array with the population including the city [[1 ... n + 1], ...]
+        """
+        rows, columns = population.shape
+        if columns == 0:
+            return np.full((rows, 1), city, dtype=population.dtype)
+
+        # Cost of inserting before the first gene, between each pair of genes and after the last gene
+        costs = np.empty((rows, columns + 1), dtype=np.float32)
+        costs[:, 0] = self.distance_matrix[city, population[:, 0]]
+        costs[:, -1] = self.distance_matrix[population[:, -1], city]
+        left, right = population[:, :-1], population[:, 1:]
+        costs[:, 1:-1] = self.distance_matrix[left, city] + self.distance_matrix[city, right] - \
+            self.distance_matrix[left, right]
+
+        positions = np.argmin(costs, axis=1)
+        mask = np.arange(columns + 1) == positions[:, np.newaxis]
+        child_population = np.empty((rows, columns + 1), dtype=population.dtype)
+        child_population[mask] = city
+        child_population[~mask] = population.ravel()
+
+        return child_population
+
+    def repair_best_chromosome(self, repair):
+        """
+        Apply to the best chromosome from history the same repair applied to the population.
+
+        :param repair: Function receiving and returning a population [[1 ... n], ... ,[1 ... n]]
+        """
+        if self.best_chromosome:
+            chromosome = repair(np.array([self.best_chromosome[0]]))
+            self.best_chromosome = chromosome[0], self.get_aptitude_function(chromosome)[0]
 
     def get_next_generation(self, population: np.array) -> np.array:
         """
@@ -42,18 +199,21 @@ class TravelerServices:
         :param population: Numpy Array with all the population [[1 ... n], ... ,[1 ... n]]
         """
         aptitude_function = self.get_aptitude_function(population)
-        child_population = np.empty((0, self.chromosome_size), dtype=np.uint8)
+        child_population = self.get_child_population(population, aptitude_function)
+        child_aptitude_function = self.get_aptitude_function(child_population)
+        self.save_best_chromosome(child_population, child_aptitude_function)
 
-        for i in range(self.population_size):
-            parent_chromosome = self.get_tournament_winner(population, aptitude_function)
-            child_chromosome = self.reproduction(parent_chromosome)
-            child_population = np.append(child_population, [child_chromosome], axis=0)
-            # print("Parent: {}, Child: {}\n\n".format(parent_chromosome, child_chromosome))
+        return child_population, child_aptitude_function
 
-        child_aptitude_function = self.get_aptitude_function(child_population)
+    def save_best_chromosome(self, population: np.array, aptitude_function: np.array):
+        """
+        Saving the best chromosome of a generation in the history.
 
+        :param population: Numpy Array with all the population [[1 ... n], ... ,[1 ... n]]
+        :param aptitude_function: Numpy Array with all the aptitude functions for each chromosome
+        """
         # Saving and comparing against the best chromosome from history
-        best_chromosome = self.get_best_from_population(child_population, child_aptitude_function)
+        best_chromosome = self.get_best_from_population(population, aptitude_function)
         if self.best_chromosome:
             if self.best_chromosome[1] > best_chromosome[1]:
                 self.best_chromosome = best_chromosome
@@ -67,7 +227,33 @@ class TravelerServices:
         # print(best_chromosome[0], self.best_chromosome[0])
         # print(best_chromosome[1], self.best_chromosome[1])
 
-        return child_population, child_aptitude_function
+    def get_child_population(self, population: np.array, aptitude_function: np.array) -> np.array:
+        """
+        Getting a child population, each child reproduced from the winner of a tournament.
+
+        :param population: Numpy Array with all the population [[1 ... n], ... ,[1 ... n]]
+        :param aptitude_function: Numpy Array with all the aptitude functions for each chromosome
+        :return: Numpy Array with the child population [[1 ... n], ... ,[1 ... n]]
+        """
+        shape = (self.population_size, self.chromosome_size)
+        parent_population = np.empty(shape, dtype=population.dtype)
+        child_population = np.empty_like(parent_population)
+        selected = self.operator_scheduler.select(self.population_size)
+        cpu_times = np.empty(self.population_size)
+
+        for i in range(self.population_size):
+            parent_population[i] = self.get_tournament_winner(population, aptitude_function)
+            start = time.process_time()
+            child_population[i] = self.reproduction(parent_population[i], selected[i])
+            cpu_times[i] = time.process_time() - start
+            # print("Parent: {}, Child: {}\n\n".format(parent_population[i], child_population[i]))
+
+        # Crediting each operator with the improvement it achieved per CPU second
+        improvements = self.get_aptitude_function(parent_population) - \
+            self.get_aptitude_function(child_population)
+        self.operator_scheduler.update(selected, improvements, cpu_times)
+
+        return child_population
 
     def get_aptitude_function(self, population: np.array):
         """
@@ -76,24 +262,8 @@ class TravelerServices:
         :param population: Numpy Array with all the population [[1 ... n], ... ,[1 ... n]]
         :return: Numpy Array with all the aptitude functions for each chromosome
         """
-
-        def get_distance(p1, p2):
-            """Get distance between two given points"""
-            return np.float32(math.sqrt(((p1[0] - p2[0]) ** 2) + ((p1[1] - p2[1]) ** 2)))
-
-        aptitude_function, population_index = np.empty(0, dtype=np.float32), 0
-        while population_index < self.population_size:
-            summation, chromosome_index = 0, 0
-            while chromosome_index + 1 < self.chromosome_size:
-                summation += get_distance(
-                    self.mapping_table.get(population[population_index][chromosome_index]),
-                    self.mapping_table.get(population[population_index][chromosome_index + 1])
-                )
-                chromosome_index += 1
-            aptitude_function = np.append(aptitude_function, [summation], axis=0)
-            population_index += 1
-
-        return aptitude_function
+        distances = self.distance_matrix[population[:, :-1], population[:, 1:]]
+        return distances.sum(axis=1, dtype=np.float32)
 
     def get_tournament_winner(self, population, aptitude_function):
         """
@@ -117,67 +287,19 @@ class TravelerServices:
 
         return population[winner_index]
 
-    def reproduction(self, chromosome):
+    def reproduction(self, chromosome, operator=None):
         """
-        Modifying a little bit the genes from the chromosome in 1 of 2 possible ways.
+        Modifying a little bit the genes from the chromosome with one of the mutation operators.
 
         :param chromosome: Numpy Array with the number (tag) of cities [1, ... , 14]
+        :param operator: Integer with the index of the operator in the scheduler. By default the
+                         scheduler chooses it.
         return: Numpy Array with some genes changes from the original chromosome
         """
-        child_chromosome = np.copy(chromosome)
-        option = np.random.randint(0, 2, dtype=np.uint8)  # Randomly select a reproduction option
-
-        if option == 0:  # Reversing a chunk from the array -> [1,2,3] -> [3,2,1]
-            start_index = np.random.randint(0, self.chromosome_size - 1, dtype=np.uint8)
-            end_index = np.random.randint(start_index, self.chromosome_size, dtype=np.uint8)
-
-            # Specific logic for Python syntax
-            revert_index = start_index - 1
-            if revert_index > 0:
-                inverted_chunk = np.copy(child_chromosome[end_index:revert_index:-1])
-            else:
-                inverted_chunk = np.copy(child_chromosome[end_index::-1])
-
-            # print("Inverted chunk {} - ({},{})".format(inverted_chunk, start_index, end_index))
-
-            swap_index = 0
-            for idx in range(start_index, end_index + 1):
-                child_chromosome[idx] = inverted_chunk[swap_index]
-                swap_index += 1
-
-        else:
-            # Getting a random index for chunks A and B
-            while True:
-                start_index_a = np.random.randint(0, self.chromosome_size - 4, dtype=np.uint8)
-                end_index_a = np.random.randint(start_index_a + 1, self.chromosome_size - 3,
-                                                dtype=np.uint8)
-                chunk_size = end_index_a - start_index_a
-                if end_index_a + 1 >= self.chromosome_size - chunk_size:
-                    continue
-                start_index_b = np.random.randint(end_index_a + 1,
-                                                  self.chromosome_size - chunk_size, dtype=np.uint8)
-                end_index_b = start_index_b + chunk_size
-                if end_index_b >= self.chromosome_size:
-                    continue  # Try again
-
-                break  # Everything went ok
-
-            # Getting chunks
-            first_chunk = np.copy(child_chromosome[start_index_a: end_index_a + 1])
-            second_chunk = np.copy(child_chromosome[start_index_b: end_index_b + 1])
-
-            # print("1° chunk {}, Indexes ({},{})".format(first_chunk, start_index_a, end_index_a))
-            # print("2° chunk {}, Indexes ({},{})".format(second_chunk, start_index_b, end_index_b))
-
-            # Swapping the chunks in the child chromosome
-            swap_index = 0
-            for idx in range(start_index_a, end_index_a + 1):
-                child_chromosome[idx] = second_chunk[swap_index]
-                child_chromosome[start_index_b] = first_chunk[swap_index]
-                start_index_b += 1
-                swap_index += 1
-
-        return child_chromosome
+        if operator is None:
+            operator = self.operator_scheduler.select(1)[0]
+        scheduler = self.operator_scheduler
+        return scheduler.registry[scheduler.operators[operator]](chromosome)
 
     def get_best_from_population(self, population, aptitude_function):
         """
@@ -205,6 +327,8 @@ class TravelerServices:
         :param population: Numpy Array with all the population [[1 ... n], ... ,[1 ... n]]
         :param aptitude_function: Numpy Array with all the aptitude functions for each chromosome
         """
+        import matplotlib.pyplot as plt  # Only needed when plotting, it is slow to import
+
         generation = len(self.aptitude_function_history)
         best_chromosome = self.get_best_from_population(population, aptitude_function)
         print("Best chromosome from generation #{}:  {}".format(generation, best_chromosome))
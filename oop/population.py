@@ -15,6 +15,8 @@ class Population:
         self.size = size
         if chromosome_size is not None:
             self.chromosomes = [Chromosome(chromosome_size) for _ in range(self.size)]
+        else:
+            self.chromosomes = list()  # Filled by the caller, never share the class attribute
 
     def get_tournament_winner(self, mapping_table: dict) -> Chromosome:
         """Identify the Chromosome winner of a tournament. Choosing only the 5% of the population size.
@@ -1,5 +1,4 @@
 """This file contains the required methods to apply the genetic algorith logic to the traveler problem."""
-import matplotlib.pyplot as plt
 from .population import Population
 
 
@@ -18,6 +17,7 @@ class TravelerServices:
         cities = [city for city in range(1, len(coordinates) + 2)]
         self.mapping_table = {city: coordinate for city, coordinate in zip(cities, coordinates)}
         self.initial_population = Population(size=population_size, chromosome_size=len(coordinates))
+        self.aptitude_function_history = list()
 
     def run(self, generations: int):
         """Run all the processes needed for applying the genetic algorithm to the traveler problem.
@@ -54,6 +54,8 @@ class TravelerServices:
 
     def plot(self, population: Population, generation: int):
         """"""
+        import matplotlib.pyplot as plt  # Only needed when plotting, it is slow to import
+
         best_chromosome = population.get_best_chromosome(self.mapping_table)
         # print("Best chromosome from generation #{}:  {}".format(generation, best_chromosome.content))
 
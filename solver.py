@@ -0,0 +1,309 @@
+"""Single entry point to solve the traveler problem with any of the available engines."""
+import importlib.util
+import json
+import os
+import random
+import sys
+import time
+
+
+class SolverConfig:
+    """Settings shared by every engine."""
+
+    def __init__(self, population_size: int = 200, generations: int = 80,
+                 heuristic_ratio: float = 0.0, backend: str = "auto", processes: int = None):
+        """
+        param population_size: Integer with the size of population
+        param generations: Integer with the number of generations to evolve
+        param heuristic_ratio: Float in [0, 1] with the portion of the initial population built
+                               with heuristics. Ignored by the 'python' engine.
+        param backend: String with the name of a registered engine or 'auto'
+        param processes: Integer with the number of workers for the 'multiprocess' engine,
+                         by default the number of CPUs
+        """
+        self.population_size = population_size
+        self.generations = generations
+        self.heuristic_ratio = heuristic_ratio
+        self.backend = backend
+        self.processes = processes or os.cpu_count() or 1
+
+
+class SolverResult:
+    """Outcome of a run, the same whichever engine produced it."""
+
+    def __init__(self, chromosome: list, distance: float, history: list, backend: str,
+                 elapsed: float = 0.0):
+        """
+        param chromosome: List with the number (tag) of the cities in the best order found
+        param distance: Float with the aptitude function of the chromosome
+        param history: List with the best aptitude function of each generation
+        param backend: String with the name of the engine that produced the result
+        param elapsed: Float with the seconds spent solving
+        """
+        self.chromosome = chromosome
+        self.distance = distance
+        self.history = history
+        self.backend = backend
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return "SolverResult(backend={!r}, distance={:.4f}, chromosome={})".format(
+            self.backend, self.distance, self.chromosome)
+
+
+class Engine:
+    """Registered way of running the genetic algorithm."""
+
+    def __init__(self, name: str, run, requires: tuple = ()):
+        """
+        param name: String with the name of the engine
+        param run: Function receiving (coordinates, config) and returning a SolverResult
+        param requires: Tuple with the names of the modules the engine needs
+        """
+        self.name = name
+        self.run = run
+        self.requires = requires
+
+    def is_available(self) -> bool:
+        """Check that the required modules can be imported, without importing them."""
+        return all(importlib.util.find_spec(module) is not None for module in self.requires)
+
+
+ENGINES = {}
+
+
+def register_engine(name: str, requires: tuple = ()):
+    """
+    Decorator adding a function to the engine registry.
+
+    param name: String with the name of the engine
+    param requires: Tuple with the names of the modules the engine needs
+    """
+    def decorator(run):
+        ENGINES[name] = Engine(name, run, requires)
+        return run
+    return decorator
+
+
+def get_available_engines() -> list:
+    """Getting the names of the engines whose requirements are installed."""
+    return [name for name, engine in ENGINES.items() if engine.is_available()]
+
+
+def _get_numpy_result(traveler, backend: str) -> SolverResult:
+    """Build a SolverResult from a run of the NumPy 'TravelerServices'."""
+    return SolverResult(chromosome=[int(gene) for gene in traveler.best_chromosome[0]],
+                        distance=float(traveler.best_chromosome[1]),
+                        history=[float(value) for value in traveler.aptitude_function_history],
+                        backend=backend)
+
+
+@register_engine("python")
+def run_python(coordinates: list, config: SolverConfig) -> SolverResult:
+    """Run the pure Python engine built on 'Population' and 'Chromosome'."""
+    from oop.services import TravelerServices
+
+    traveler = TravelerServices(config.population_size, coordinates)
+    traveler.run(config.generations)
+    return SolverResult(chromosome=list(traveler.best_chromosome.data),
+                        distance=traveler.best_chromosome.aptitude_function,
+                        history=list(traveler.aptitude_function_history),
+                        backend="python")
+
+
+@register_engine("numpy", requires=("numpy",))
+def run_numpy(coordinates: list, config: SolverConfig) -> SolverResult:
+    """Run the vectorized NumPy engine."""
+    from np.services import TravelerServices
+
+    traveler = TravelerServices(config.population_size, coordinates, config.heuristic_ratio)
+    traveler.run(config.generations)
+    return _get_numpy_result(traveler, "numpy")
+
+
+@register_engine("compiled", requires=("numpy", "numba"))
+def run_compiled(coordinates: list, config: SolverConfig) -> SolverResult:
+    """Run the NumPy engine with the generation loop compiled by numba."""
+    from np.compiled import CompiledTravelerServices
+
+    traveler = CompiledTravelerServices(config.population_size, coordinates, config.heuristic_ratio)
+    traveler.run(config.generations)
+    return _get_numpy_result(traveler, "compiled")
+
+
+MIN_ISLAND_SIZE = 20  # Chromosomes per island, the tournament takes 5% of them
+
+
+def get_island_count(population_size: int, processes: int) -> int:
+    """
+    Getting the number of islands of the 'multiprocess' engine. Smaller islands would have
+    single-chromosome tournaments, that is no selection at all.
+
+    param population_size: Integer with the size of the whole population
+    param processes: Integer with the number of workers
+    return: Integer with the number of islands, at least 1
+    """
+    return max(min(processes, population_size // MIN_ISLAND_SIZE), 1)
+
+
+def _run_island(arguments: tuple) -> SolverResult:
+    """Run one island of the 'multiprocess' engine, it must be importable by the workers."""
+    coordinates, config, seed = arguments
+    import numpy as np
+
+    np.random.seed(seed)
+    return run_numpy(coordinates, config)
+
+
+@register_engine("multiprocess", requires=("numpy",))
+def run_multiprocess(coordinates: list, config: SolverConfig) -> SolverResult:
+    """
+    Run independent NumPy islands on several processes, each evolving a share of the population.
+    The best chromosome among the islands is returned.
+    """
+    import multiprocessing
+
+    processes = get_island_count(config.population_size, config.processes)
+    island_size, remainder = divmod(config.population_size, processes)
+    island_configs = [SolverConfig(population_size=island_size + (island < remainder),
+                                   generations=config.generations,
+                                   heuristic_ratio=config.heuristic_ratio,
+                                   backend="numpy")
+                      for island in range(processes)]
+    seeds = random.sample(range(2 ** 31), processes)
+
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.map(_run_island, [(coordinates, island_config, seed)
+                                         for island_config, seed in zip(island_configs, seeds)])
+
+    best_result = min(results, key=lambda result: result.distance)
+    best_result.history = [min(values) for values in zip(*[result.history for result in results])]
+    best_result.backend = "multiprocess"
+    return best_result
+
+
+CALIBRATION_VERSION = 2  # Bumped when the benchmark changes, so older caches are not reused
+
+
+class Solver:
+    """Facade that runs the genetic algorithm on the fastest engine for each instance."""
+    calibration_sizes = ((16, 20, 5), (64, 40, 5))  # (cities, population size, generations)
+
+    def __init__(self, config: SolverConfig = None, cache_path: str = None):
+        """
+        param config: SolverConfig with the settings of the runs
+        param cache_path: String with the path of the calibration file. By default it is kept
+                          in the user cache directory.
+        """
+        self.config = config or SolverConfig()
+        if self.config.backend != "auto" and self.config.backend not in ENGINES:
+            raise ValueError("Unknown backend '{}', choose one of {}".format(
+                self.config.backend, ["auto"] + list(ENGINES)))
+
+        self.cache_path = cache_path or os.path.join(
+            os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+            "genetic_algorithm-traveler", "calibration.json")
+        self.calibration = None
+
+    def solve(self, coordinates: list) -> SolverResult:
+        """
+        Run the genetic algorithm over the cities.
+
+        param coordinates: List of tuples with the coordinates for each city -> [(p1,p2), ...]
+        return: SolverResult with the best chromosome found
+        """
+        backend = self.select_backend(len(coordinates))
+        start = time.perf_counter()
+        result = ENGINES[backend].run(coordinates, self.config)
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def select_backend(self, chromosome_size: int) -> str:
+        """
+        Pick the engine, the one from the config or the fastest one for the instance size
+        according to the calibration.
+
+        param chromosome_size: Integer with the number of cities
+        return: String with the name of the engine
+        """
+        if self.config.backend != "auto":
+            if not ENGINES[self.config.backend].is_available():
+                raise ImportError("The backend '{}' requires the modules {}".format(
+                    self.config.backend, ENGINES[self.config.backend].requires))
+            return self.config.backend
+
+        calibration = self.calibrate()
+        workload = self.config.population_size * self.config.generations * chromosome_size
+
+        def get_cost(name: str) -> float:
+            cost = calibration[name]["per_gene"] * workload
+            if name == "multiprocess":  # Calibrated with one island per process
+                cost *= self.config.processes / get_island_count(self.config.population_size,
+                                                                 self.config.processes)
+            return calibration[name]["overhead"] + cost
+
+        return min(calibration, key=get_cost)
+
+    def calibrate(self, force: bool = False) -> dict:
+        """
+        Time every available engine on a micro-benchmark and fit its cost as a fixed overhead
+        plus a cost per gene and generation. The result is cached in 'cache_path' and reused
+        while the benchmark, engines, CPU count, number of processes and Python version stay
+        the same.
+
+        param force: Boolean to repeat the benchmark even if there is a cached result
+        return: Dictionary {engine: {"overhead": seconds, "per_gene": seconds}}
+        """
+        key = {"version": CALIBRATION_VERSION, "engines": get_available_engines(),
+               "cpus": os.cpu_count(), "processes": self.config.processes,
+               "python": sys.version.split()[0]}
+
+        # A missing, unreadable or corrupt cache only means calibrating again
+        if self.calibration is None and not force:
+            try:
+                with open(self.cache_path) as cache:
+                    cached = json.load(cache)
+                if cached.get("key") == key:
+                    self.calibration = cached["calibration"]
+            except (OSError, ValueError, AttributeError, KeyError):
+                pass
+
+        if self.calibration is None or force:
+            self.calibration = {name: self.benchmark(name) for name in key["engines"]}
+            # Read-only cache directories are common for workers, keep the calibration in memory
+            try:
+                os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+                with open(self.cache_path, "w") as cache:
+                    json.dump({"key": key, "calibration": self.calibration}, cache, indent=2)
+            except OSError:
+                pass
+
+        return self.calibration
+
+    def benchmark(self, backend: str) -> dict:
+        """
+        Time an engine on the calibration sizes.
+
+        param backend: String with the name of the engine
+        return: Dictionary with the fitted "overhead" and "per_gene" seconds
+        """
+        measures = []
+        # The first run only warms up imports and compilation caches
+        sizes = (self.calibration_sizes[0],) + tuple(self.calibration_sizes)
+        for index, (chromosome_size, population_size, generations) in enumerate(sizes):
+            if backend == "multiprocess":
+                # Enough chromosomes for one island per process, the speedup it is chosen for
+                population_size = max(population_size, MIN_ISLAND_SIZE * self.config.processes)
+            coordinates = [(random.random(), random.random()) for _ in range(chromosome_size)]
+            config = SolverConfig(population_size, generations, backend=backend,
+                                  processes=self.config.processes)
+            start = time.perf_counter()
+            ENGINES[backend].run(coordinates, config)
+            if index:
+                measures.append((population_size * generations * chromosome_size,
+                                 time.perf_counter() - start))
+
+        (small_workload, small_time), (large_workload, large_time) = measures
+        per_gene = max((large_time - small_time) / (large_workload - small_workload), 0.0)
+        overhead = max(small_time - per_gene * small_workload, 0.0)
+        return {"overhead": overhead, "per_gene": per_gene}
@@ -0,0 +1,45 @@
+"""Regression test on the cold-start import time of the modules loaded by CLI and worker processes."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET = 2.0  # Seconds of cumulative import time, generous so slow machines do not fail
+LAZY_MODULES = ("matplotlib", "multiprocessing")
+
+
+def get_import_trace(module: str) -> dict:
+    """
+    Import a module in a fresh interpreter with '-X importtime'.
+
+    :param module: String with the name of the module to import
+    :return: Dictionary {imported module: cumulative microseconds}
+    """
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + module],
+                             cwd=ROOT, capture_output=True, text=True, check=True)
+    trace = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        trace[name.strip()] = int(cumulative)
+    return trace
+
+
+@pytest.mark.parametrize("module, requires", [
+    ("np.services", "numpy"),
+    ("oop.services", None),
+    ("solver", None),
+])
+def test_cold_start_import(module, requires):
+    if requires:
+        pytest.importorskip(requires)
+
+    trace = get_import_trace(module)
+
+    eager = [name for name in trace if name.split(".")[0] in LAZY_MODULES]
+    assert not eager, "{} imports {} at module level".format(module, eager)
+    assert trace[module] / 1e6 < BUDGET
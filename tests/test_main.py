@@ -0,0 +1,18 @@
+"""Tests of the command line entry point."""
+import pytest
+
+from main import get_parser
+from solver import ENGINES
+
+
+def test_backend_choices_match_the_engines():
+    choices = next(action.choices for action in get_parser()._actions if action.dest == "backend")
+    assert set(choices) == {"auto"} | set(ENGINES)
+
+
+def test_unknown_backend_is_a_usage_error(capsys):
+    with pytest.raises(SystemExit) as error:
+        get_parser().parse_args(["--backend", "nump"])
+
+    assert error.value.code == 2
+    assert "invalid choice" in capsys.readouterr().err
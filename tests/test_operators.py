@@ -0,0 +1,38 @@
+"""Tests of the mutation operators and of the schedulers choosing between them."""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from np.operators import OPERATORS, AdaptivePursuit, ProbabilityMatching, reversal  # noqa: E402
+from np.services import TravelerServices  # noqa: E402
+
+
+COORDINATES = [(1, 7), (2, 5), (4, 4), (2, 3), (3, 2), (1, 1), (5, 1), (7, 3), (6, 6), (10, 5)]
+
+
+@pytest.mark.parametrize("name", list(OPERATORS))
+def test_operators_return_permutations(name):
+    chromosome = np.arange(1, 11, dtype=np.uint8)
+    for _ in range(50):
+        child = OPERATORS[name](chromosome)
+        assert np.array_equal(np.sort(child), chromosome)
+
+
+@pytest.mark.parametrize("scheduler_class", [AdaptivePursuit, ProbabilityMatching])
+def test_custom_registry(scheduler_class):
+    calls = []
+
+    def mine(chromosome):
+        calls.append(len(chromosome))
+        return reversal(chromosome)
+
+    scheduler = scheduler_class(operators=["mine"], registry={"mine": mine})
+    traveler = TravelerServices(20, COORDINATES, operator_scheduler=scheduler)
+    traveler.run(2)
+
+    assert len(calls) == 40
+
+
+def test_unknown_operator():
+    with pytest.raises(ValueError):
+        AdaptivePursuit(operators=["mine"])
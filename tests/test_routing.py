@@ -0,0 +1,117 @@
+"""Tests of the multi-vehicle (mTSP / CVRP) traveler services."""
+import itertools
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from np.routing import ROUTE_OPERATORS, VehicleRoutingServices, split  # noqa: E402
+
+
+def get_coordinates(chromosome_size: int) -> list:
+    return [tuple(point) for point in np.random.random((chromosome_size, 2)) * 10]
+
+
+def test_shared_capacity_follows_the_customers():
+    np.random.seed(0)
+    services = VehicleRoutingServices(20, get_coordinates(40), (5, 5), vehicles=4)
+    services.run(5)
+    assert services.capacity == 10
+
+    services.add_city((3, 3))
+    assert services.capacity == 11
+    assert len(services.get_routes(services.best_chromosome[0])) <= 4
+    assert services.best_chromosome[1] < services.route_penalty
+
+    services.remove_city(7)
+    services.remove_city(2)
+    assert services.capacity == 10
+    assert len(services.demands) == services.chromosome_size + 1
+
+
+def test_fleet_too_small():
+    with pytest.raises(ValueError):
+        VehicleRoutingServices(20, get_coordinates(40), (5, 5), capacity=5, vehicles=4)
+
+    services = VehicleRoutingServices(20, get_coordinates(40), (5, 5), capacity=10, vehicles=4)
+    with pytest.raises(ValueError):
+        services.add_city((3, 3))
+    assert len(services.demands) == services.chromosome_size + 1
+
+
+def brute_force_split(tour_distances, depot_distances, loads, capacity, vehicles=None):
+    """Cheapest split trying every set of route starts, with at most 'vehicles' routes."""
+    size = len(depot_distances)
+    best_cost, best_starts = math.inf, None
+    for cuts in itertools.product((False, True), repeat=size - 1):
+        starts = [0] + [index + 1 for index, cut in enumerate(cuts) if cut]
+        if vehicles is not None and len(starts) > vehicles:
+            continue
+        cost = 0.0
+        for i, j in zip(starts, starts[1:] + [size]):
+            if loads[j] - loads[i] > capacity:
+                break
+            cost += depot_distances[i] + tour_distances[j - 1] - tour_distances[i] + \
+                depot_distances[j - 1]
+        else:
+            if cost < best_cost:
+                best_cost, best_starts = cost, starts
+    return best_cost, best_starts
+
+
+def get_split_instance(size: int) -> tuple:
+    tour_distances = np.concatenate(([0.0], np.cumsum(np.random.random(size - 1)))).tolist()
+    depot_distances = np.random.random(size).tolist()
+    loads = np.concatenate(([0.0], np.cumsum(np.random.randint(1, 4, size)))).tolist()
+    return tour_distances, depot_distances, loads
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("vehicles", [None, 2, 3, 5])
+def test_split_matches_brute_force(seed, vehicles):
+    np.random.seed(seed)
+    tour_distances, depot_distances, loads = get_split_instance(np.random.randint(1, 9))
+    capacity = float(np.random.randint(3, 8))
+
+    cost, starts = split(tour_distances, depot_distances, loads, capacity, vehicles, penalty=100.0)
+    expected_cost, expected_starts = brute_force_split(tour_distances, depot_distances, loads,
+                                                       capacity, vehicles)
+
+    if expected_starts is None:  # The fleet is too small, every extra route is penalised
+        expected_cost, expected_starts = brute_force_split(tour_distances, depot_distances,
+                                                           loads, capacity)
+        expected_cost += 100.0 * (len(starts) - vehicles)
+        assert len(starts) > vehicles
+    assert cost == pytest.approx(expected_cost)
+    assert starts[0] == 0 and starts == sorted(set(starts))
+
+
+def get_routes_cost(services, chromosome, route_starts) -> float:
+    """Recompute the aptitude function of a chromosome from the routes it is split into."""
+    bounds = services.get_route_bounds(route_starts)
+    cost = sum(services.get_route_cost(chromosome[bounds[r]:bounds[r + 1]])
+               for r in range(len(bounds) - 1))
+    if services.vehicles is not None:
+        cost += services.route_penalty * max(len(bounds) - 1 - services.vehicles, 0)
+    return cost
+
+
+@pytest.mark.parametrize("name", list(ROUTE_OPERATORS))
+@pytest.mark.parametrize("vehicles, capacity, unit_demands", [(None, 4, False), (3, None, True),
+                                                              (2, None, False)])
+def test_route_operators_score_incrementally(name, vehicles, capacity, unit_demands):
+    np.random.seed(1)
+    demands = None if unit_demands else np.random.randint(1, 4, 15)
+    services = VehicleRoutingServices(10, get_coordinates(15), (5, 5), demands=demands,
+                                      capacity=capacity, vehicles=vehicles)
+    aptitude_function, route_starts = services.split_population(services.population)
+
+    for chromosome, starts, value in zip(services.population, route_starts, aptitude_function):
+        assert value == pytest.approx(get_routes_cost(services, chromosome, starts), rel=1e-5)
+        for _ in range(20):
+            child, child_starts, child_value = ROUTE_OPERATORS[name](services, chromosome,
+                                                                     starts, value)
+            assert np.array_equal(np.sort(child), np.arange(1, 16))
+            assert child_value == pytest.approx(get_routes_cost(services, child, child_starts),
+                                                rel=1e-4)
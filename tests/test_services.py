@@ -0,0 +1,84 @@
+"""Tests of the warm-start edits (add, remove and move cities) of the NumPy traveler services."""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from np.services import TravelerServices  # noqa: E402
+
+
+def get_traveler(chromosome_size: int, population_size: int = 20) -> TravelerServices:
+    """Build a traveler over random cities and evolve it a few generations."""
+    np.random.seed(0)
+    coordinates = [tuple(point) for point in np.random.random((chromosome_size, 2))]
+    traveler = TravelerServices(population_size, coordinates, heuristic_ratio=0.5)
+    traveler.run(3)
+    return traveler
+
+
+def get_distance(traveler: TravelerServices, chromosome) -> float:
+    """Recompute the distance of a chromosome from the coordinates, ignoring the matrix."""
+    points = np.array([traveler.mapping_table[gene] for gene in chromosome], dtype=np.float64)
+    return float(np.sqrt(((points[1:] - points[:-1]) ** 2).sum(axis=1)).sum())
+
+
+def check_consistency(traveler: TravelerServices):
+    """Every chromosome is a permutation of the tags and the best one is scored right."""
+    tags = np.arange(1, traveler.chromosome_size + 1)
+    assert sorted(traveler.mapping_table) == list(tags)
+    assert traveler.population.shape == (traveler.population_size, traveler.chromosome_size)
+    for chromosome in traveler.population:
+        assert np.array_equal(np.sort(chromosome), tags)
+
+    chromosome, aptitude_function = traveler.best_chromosome
+    assert np.array_equal(np.sort(chromosome), tags)
+    assert aptitude_function == pytest.approx(get_distance(traveler, chromosome), rel=1e-4)
+
+
+def test_add_city():
+    traveler = get_traveler(12)
+    for _ in range(30):  # Enough to grow the buffers more than once
+        traveler.add_city(tuple(np.random.random(2)))
+        check_consistency(traveler)
+    traveler.run(2)
+    check_consistency(traveler)
+
+
+@pytest.mark.parametrize("city", [1, 5, 12])
+def test_remove_city(city):
+    traveler = get_traveler(12)
+    last_coordinate = traveler.mapping_table[12]
+
+    traveler.remove_city(city)
+
+    check_consistency(traveler)
+    if city != 12:  # The last city takes the tag of the removed one
+        assert traveler.mapping_table[city] == last_coordinate
+    traveler.run(2)
+    check_consistency(traveler)
+
+
+def test_remove_unknown_city():
+    traveler = get_traveler(12)
+    with pytest.raises(ValueError):
+        traveler.remove_city(13)
+
+
+def test_move_city():
+    traveler = get_traveler(12)
+    traveler.move_city(3, (5.0, 5.0))
+    check_consistency(traveler)
+    assert traveler.mapping_table[3] == (5.0, 5.0)
+
+
+def test_tags_past_uint8():
+    traveler = get_traveler(255, population_size=4)
+    assert traveler.population.dtype == np.uint8
+
+    city = traveler.add_city((0.5, 0.5))
+
+    assert city == 256
+    assert traveler.population.dtype == np.uint16
+    check_consistency(traveler)
+
+    traveler.remove_city(7)
+    check_consistency(traveler)
@@ -0,0 +1,42 @@
+"""Tests of the solver facade and its engines."""
+import random
+
+from solver import ENGINES, MIN_ISLAND_SIZE, Solver, SolverConfig, run_python
+
+
+def get_coordinates(chromosome_size: int) -> list:
+    return [(random.random(), random.random()) for _ in range(chromosome_size)]
+
+
+def test_python_engine_keeps_instances_apart():
+    config = SolverConfig(population_size=20, generations=5, backend="python")
+
+    first = run_python(get_coordinates(10), config)
+    second = run_python(get_coordinates(30), config)
+
+    assert sorted(first.chromosome) == list(range(1, 11))
+    assert sorted(second.chromosome) == list(range(1, 31))
+    assert len(second.history) == 5
+
+
+def test_multiprocess_calibrated_with_one_island_per_process(monkeypatch):
+    population_sizes = []
+
+    def run(coordinates, config):
+        population_sizes.append(config.population_size)
+
+    monkeypatch.setattr(ENGINES["multiprocess"], "run", run)
+    Solver(SolverConfig(processes=4)).benchmark("multiprocess")
+
+    assert min(population_sizes) >= 4 * MIN_ISLAND_SIZE
+
+
+def test_multiprocess_cost_with_fewer_islands():
+    solver = Solver(SolverConfig(population_size=40, backend="auto", processes=4))
+    # Faster with one island per process, but 40 chromosomes only make 2 islands for 4 processes
+    solver.calibration = {"numpy": {"overhead": 0.0, "per_gene": 1.0},
+                          "multiprocess": {"overhead": 0.0, "per_gene": 0.6}}
+
+    assert solver.select_backend(50) == "numpy"
+    solver.config.population_size = 80
+    assert solver.select_backend(50) == "multiprocess"